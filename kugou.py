@@ -5,112 +5,319 @@ KuGou downloader (free tracks only; no paywall bypass).
 - Saves to /storage/emulated/0/Download (Android/Termux)
 - Picks best cover in this order:
   desktop album_img -> album_img from page JSON -> page og:image -> album page og:image -> mobile imgUrl
-- Embeds cover + basic ID3
+- Embeds cover + basic ID3 (title/artist/album) in a single save
 - Title tag = just the song title (from "Artist - Title")
 Usage:
   python kugou.py "<kugou url>"
   python kugou.py "<kugou url>" --cover "https://example.com/cover.jpg"
 """
 
-import os, re, sys, argparse, urllib.parse
-from typing import Optional, Tuple, Dict
+import os, re, sys, json, shutil, socket, struct, argparse, threading, urllib.parse
+import html as html_lib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Tuple, Dict, List, Iterator
 
 import requests
-import mutagen.easyid3, mutagen.id3, mutagen.mp3
-
-CHUNK_SIZE = 1024 * 256
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+
+try:
+    import orjson  # optional, faster JSON decoding
+except ImportError:
+    orjson = None
+
+CHUNK_SIZE = 1024 * 1024
+OG_RANGE = "bytes=0-32767"
+PAGE_CHUNK = 1024 * 16
+PAGE_MAX = 1024 * 512
+# Parallel ranged download: worker count, and smallest body worth splitting
+RANGE_WORKERS = 4
+RANGE_MIN_SIZE = 1024 * 1024 * 2
+# Disk writes are batched to this size (each write crosses FUSE on Android)
+WRITE_BUFFER = 1024 * 1024 * 4
+
+# Patterns used on every run, compiled once
+_RE_UNSAFE = re.compile(r'[<>:"/\\|?*\x00-\x1F]')
+_RE_WS = re.compile(r"\s+")
+_RE_HASH_JSON = re.compile(r'"hash"\s*:\s*"([A-F0-9]{32})"', re.I)
+_RE_HASH_KV = re.compile(r'hash=([A-F0-9]{32})', re.I)
+_RE_ALBUM = re.compile(r'"album_id"\s*:\s*(\d+)')
+# bytes versions, for scanning the raw mixsong page stream
+_RE_HASH_JSON_B = re.compile(rb'"hash"\s*:\s*"([A-F0-9]{32})"', re.I)
+_RE_HASH_KV_B = re.compile(rb'hash=([A-F0-9]{32})', re.I)
+_RE_ALBUM_B = re.compile(rb'"album_id"\s*:\s*(\d+)')
+_RE_OG = re.compile(r'<meta\s+property=["\']og:image["\']\s+content=["\']([^"\']+)["\']', re.I)
+_RE_KV = re.compile(r'[?#&](hash|album_id)=([A-Za-z0-9]+)(?=[&#]|$)')
+_RE_MIXSONG = re.compile(r"/(?:mixsong|kgmixsong)/([A-Za-z0-9]+)\.html")
+_RE_PAGE_IMG = tuple(re.compile(rf'"{key}"\s*:\s*"([^"]+)"', re.I)
+                     for key in ("album_img", "union_cover"))
 
 HEADERS_DESKTOP = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome Safari",
     "Referer": "https://www.kugou.com/",
+    "Accept-Encoding": "gzip, deflate",
 }
 HEADERS_MOBILE = {
     "User-Agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 15_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.0 Mobile/15E148 Safari/604.1",
     "Referer": "https://m.kugou.com/",
+    "Accept-Encoding": "gzip, deflate",
 }
 
+class _SocketOptionsAdapter(HTTPAdapter):
+    # Keep urllib3's defaults (TCP_NODELAY, so the small API requests aren't
+    # held back by Nagle) and add SO_KEEPALIVE on the pooled sockets
+    socket_options = HTTPConnection.default_socket_options + [
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ]
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = self.socket_options
+        super().init_poolmanager(*args, **kwargs)
+
+def _make_session(headers: dict) -> requests.Session:
+    # One keep-alive session per UA/Referer pair, so repeat hits on the
+    # same host skip the TCP + TLS handshake. Transient failures (429/5xx,
+    # dropped connections) are retried with backoff, honoring Retry-After;
+    # raise_on_status=False leaves the final error to raise_for_status().
+    s = requests.Session()
+    s.headers.update(headers)
+    retry = Retry(total=3, backoff_factor=0.5,
+                  status_forcelist=[429, 500, 502, 503, 504],
+                  allowed_methods=["GET", "HEAD"],
+                  respect_retry_after_header=True,
+                  raise_on_status=False)
+    adapter = _SocketOptionsAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+S_DESKTOP = _make_session(HEADERS_DESKTOP)
+S_MOBILE = _make_session(HEADERS_MOBILE)
+
 # Save to Android "Download" folder
 OUTPUT_DIR = "/storage/emulated/0/Download"
-os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 def windows_safe_name(name: str) -> str:
-    name = re.sub(r'[<>:"/\\|?*\x00-\x1F]', " ", name)
-    name = re.sub(r"\s+", " ", name).strip()
+    name = _RE_UNSAFE.sub(" ", name)
+    name = _RE_WS.sub(" ", name).strip()
     return name[:200]
 
 def _normalize_img(u: str) -> str:
     if not u:
         return ""
-    u = u.replace("{size}", "1000")
+    if "{size}" in u:
+        u = u.replace("{size}", "1000")
     if u.startswith("http://"):
         u = "https://" + u[7:]
     return u
 
-def download_file(filename: str, url: str, headers: dict):
-    print(f"⬇️  Downloading: {filename}")
-    with requests.get(url, headers=headers, stream=True, timeout=25) as r:
-        r.raise_for_status()
-        with open(filename, "wb") as f:
-            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
-                if chunk:
-                    f.write(chunk)
+class RangeDownloadError(RuntimeError):
+    """The server advertised ranges but didn't serve them as asked."""
 
-def ensure_id3_container(path: str):
+class DownloadCancelled(Exception):
+    """The caller set the cancel event while a download was running."""
+
+def _download_ranged(url: str, path: str, session: requests.Session,
+                     cancel: threading.Event,
+                     num_chunks: int = RANGE_WORKERS) -> bool:
+    """
+    Fetch url as num_chunks parallel byte ranges, each written in place
+    with os.pwrite. Returns False (nothing written) when the server doesn't
+    advertise range support. Raises RangeDownloadError / OSError when the
+    ranged attempt fails midway; download_file then streams sequentially.
+    Raises DownloadCancelled once cancel is set.
+    """
+    if not hasattr(os, "pwrite"):
+        return False
     try:
-        mp3 = mutagen.mp3.MP3(path)
-        try:
-            mp3.add_tags()
-        except Exception:
-            pass
-        mp3.save()
-    except Exception:
-        pass
+        h = session.head(url, allow_redirects=True, timeout=15)
+    except requests.RequestException:
+        return False
+    size = int(h.headers.get("Content-Length") or 0)
+    if (h.status_code != 200
+            or h.headers.get("Accept-Ranges", "").lower() != "bytes"
+            or h.headers.get("Content-Encoding", "identity") != "identity"
+            or size < RANGE_MIN_SIZE):
+        return False
+    url = h.url  # resolve redirects once, not per range
+
+    step = -(-size // num_chunks)
+    spans = [(start, min(start + step, size) - 1) for start in range(0, size, step)]
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(fd, 0, size)
+        else:
+            os.ftruncate(fd, size)
+
+        abort = threading.Event()
+
+        def fetch(span: Tuple[int, int]):
+            if abort.is_set() or cancel.is_set():
+                return
+            start, end = span
+            offset = start
+            headers = {"Range": f"bytes={start}-{end}", "Accept-Encoding": "identity"}
+            with session.get(url, headers=headers, stream=True, timeout=25) as r:
+                r.raise_for_status()
+                if r.status_code != 206:
+                    raise RangeDownloadError(f"Range request ignored (HTTP {r.status_code})")
+                buf = bytearray()
+                for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                    if abort.is_set() or cancel.is_set():
+                        return
+                    buf += chunk
+                    if len(buf) >= WRITE_BUFFER:
+                        os.pwrite(fd, buf, offset)
+                        offset += len(buf)
+                        buf.clear()
+                if buf:
+                    os.pwrite(fd, buf, offset)
+                    offset += len(buf)
+            if offset != end + 1:
+                raise RangeDownloadError(f"Short read for bytes {start}-{end}")
+
+        def fetch_or_abort(span: Tuple[int, int]):
+            # First failure stops the other ranges; the caller falls back
+            try:
+                fetch(span)
+            except BaseException:
+                abort.set()
+                raise
+
+        with ThreadPoolExecutor(max_workers=len(spans)) as ex:
+            list(ex.map(fetch_or_abort, spans))
+    finally:
+        os.close(fd)
+    if cancel.is_set():
+        raise DownloadCancelled()
+    return True
+
+def download_file(final_path: str, url: str, session: requests.Session,
+                  cancel: Optional[threading.Event] = None) -> str:
+    """
+    Download to final_path + ".part" and return that path; the caller
+    renames it into place once tagging is done. Setting cancel (checked
+    once per chunk) stops the download with DownloadCancelled.
+    """
+    print(f"⬇️  Downloading: {final_path}")
+    part_path = final_path + ".part"
+    cancel = cancel or threading.Event()
+    try:
+        if _download_ranged(url, part_path, session, cancel):
+            return part_path
+    except (RangeDownloadError, OSError) as e:
+        # Ranges ignored, short reads, fallocate unsupported on FUSE/emulated
+        # storage, dropped range connections: the single stream below
+        # rewrites the .part from scratch ("wb" truncates it)
+        print(f"⚠️  Ranged download failed ({e}); falling back to a single stream.")
+    with session.get(url, stream=True, timeout=25) as r:
+        r.raise_for_status()
+        # Copy straight from the raw stream; urllib3 still undoes any
+        # Content-Encoding, without the per-chunk iter_content overhead.
+        r.raw.decode_content = True
+        with open(part_path, "wb", buffering=WRITE_BUFFER) as f:
+            while True:
+                if cancel.is_set():
+                    raise DownloadCancelled()
+                buf = r.raw.read(CHUNK_SIZE)
+                if not buf:
+                    break
+                f.write(buf)
+    return part_path
+
+def fetch_bytes(url: str, session: requests.Session) -> bytes:
+    # Small resources (cover art) are kept in memory
+    with session.get(url, timeout=20) as r:
+        r.raise_for_status()
+        return r.content
+
+def sniff_mime(data: bytes) -> str:
+    # Trust the image's magic bytes, not the URL suffix or Content-Type
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    return "image/jpeg"
 
 # ---------- URL / Hash ----------
 def parse_hash_album_from_url_or_page(url: str) -> Tuple[str, Optional[str], Optional[str]]:
     """
     Returns (hash, album_id?, page_html_if_scraped)
     """
-    u = urllib.parse.urlparse(url)
-
-    # fragment (#)
-    frag_qs = urllib.parse.parse_qs(u.fragment)
-    if "hash" in frag_qs:
-        h = frag_qs["hash"][0]
-        album_id = frag_qs.get("album_id", [None])[0]
-        return h, album_id, None
-
-    # query (?)
-    qs = urllib.parse.parse_qs(u.query)
-    if "hash" in qs:
-        h = qs["hash"][0]
-        album_id = qs.get("album_id", [None])[0]
-        return h, album_id, None
+    # Only links carrying hash= need URL parsing; plain mixsong links skip it
+    if "hash=" in url:
+        # Fast path: plain hash=/album_id= pairs in the query or fragment.
+        # An album_id the strict pattern can't match whole goes to parse_qs
+        # below rather than being dropped.
+        kv = dict(_RE_KV.findall(url))
+        if "hash" in kv and ("album_id" in kv or "album_id=" not in url):
+            return kv["hash"], kv.get("album_id"), None
+
+        # URL-encoded or otherwise unusual forms
+        u = urllib.parse.urlparse(url)
+
+        # fragment (#)
+        frag_qs = urllib.parse.parse_qs(u.fragment)
+        if "hash" in frag_qs:
+            h = frag_qs["hash"][0]
+            album_id = frag_qs.get("album_id", [None])[0]
+            return h, album_id, None
+
+        # query (?)
+        qs = urllib.parse.parse_qs(u.query)
+        if "hash" in qs:
+            h = qs["hash"][0]
+            album_id = qs.get("album_id", [None])[0]
+            return h, album_id, None
 
     # mixsong page
-    if re.search(r"/(?:mixsong|kgmixsong)/([A-Za-z0-9]+)\.html", url):
-        resp = requests.get(url, headers=HEADERS_DESKTOP, timeout=15)
-        resp.raise_for_status()
-        html = resp.text
-        import html as html_lib
-        html = html_lib.unescape(html)
-        m_hash = re.search(r'"hash"\s*:\s*"([A-F0-9]{32})"', html, re.I) or \
-                 re.search(r'hash=([A-F0-9]{32})', html, re.I)
-        if not m_hash:
+    if _RE_MIXSONG.search(url):
+        # Stream the page as bytes and stop as soon as hash and album_id have
+        # shown up (they sit in the inline JSON near the top of the document);
+        # only what was read is decoded, once, at the end
+        buf = bytearray()
+        with S_DESKTOP.get(url, stream=True, timeout=15) as resp:
+            resp.raise_for_status()
+            encoding = resp.encoding or "utf-8"
+            for chunk in resp.iter_content(PAGE_CHUNK):
+                buf += chunk
+                if _RE_HASH_JSON_B.search(buf) and _RE_ALBUM_B.search(buf):
+                    break
+                if len(buf) > PAGE_MAX:
+                    break
+        m_hash = _RE_HASH_JSON_B.search(buf) or _RE_HASH_KV_B.search(buf)
+        m_album = _RE_ALBUM_B.search(buf)
+        h = m_hash.group(1).decode("ascii") if m_hash else None
+        album_id = m_album.group(1).decode("ascii") if m_album else None
+        html = buf.decode(encoding, errors="replace")
+        if not h or not album_id:
+            # Entity-escaped JSON: unescape what we read once and look again
+            unescaped = html_lib.unescape(html)
+            if not h:
+                m = _RE_HASH_JSON.search(unescaped) or _RE_HASH_KV.search(unescaped)
+                h = m.group(1) if m else None
+            if not album_id:
+                m = _RE_ALBUM.search(unescaped)
+                album_id = m.group(1) if m else None
+        if not h:
             raise RuntimeError("Could not find song hash in page.")
-        h = m_hash.group(1).upper()
-        m_album = re.search(r'"album_id"\s*:\s*(\d+)', html)
-        album_id = m_album.group(1) if m_album else None
-        return h, album_id, html
+        return h.upper(), album_id, html
 
     raise RuntimeError("❌ Could not find hash in URL or page.")
 
 # ---------- Metadata ----------
+def _json(r: requests.Response):
+    return orjson.loads(r.content) if orjson else r.json()
+
 def get_mobile_meta(hash_id: str) -> Dict:
     api = f"https://m.kugou.com/app/i/getSongInfo.php?cmd=playInfo&hash={hash_id}"
-    r = requests.get(api, headers=HEADERS_MOBILE, timeout=15)
+    r = S_MOBILE.get(api, timeout=15)
     r.raise_for_status()
-    data = r.json()
+    data = _json(r)
     if not isinstance(data, dict) or not data.get("url"):
         raise RuntimeError(f"Mobile API returned no free url: {data}")
     return data
@@ -119,156 +326,309 @@ def get_desktop_meta(hash_id: str, album_id: Optional[str]) -> Optional[Dict]:
     if not album_id:
         return None
     api = f"https://wwwapi.kugou.com/yy/index.php?r=play/getdata&hash={hash_id}&album_id={album_id}"
-    r = requests.get(api, headers=HEADERS_DESKTOP, timeout=15)
+    r = S_DESKTOP.get(api, timeout=15)
     r.raise_for_status()
-    payload = r.json()
+    payload = _json(r)
     if not isinstance(payload, dict) or payload.get("status") != 1 or "data" not in payload:
         raise RuntimeError(f"Desktop API unexpected: {payload}")
     return payload["data"]
 
+def fetch_all(h: str, album_id: Optional[str], url: Optional[str]) -> Tuple[Dict, Dict]:
+    """
+    Run the independent requests (mobile meta, desktop meta, page og:image)
+    in parallel. Returns (results, errors) keyed by "mobile"/"desktop"/"og";
+    one failing job never discards the others.
+    """
+    jobs = {"mobile": (get_mobile_meta, h)}
+    if album_id:
+        jobs["desktop"] = (get_desktop_meta, h, album_id)
+    if url:
+        jobs["og"] = (fetch_og_image, url, S_DESKTOP)
+
+    results, errors = {"mobile": None, "desktop": None, "og": None}, {}
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        futs = {ex.submit(fn, *args): name for name, (fn, *args) in jobs.items()}
+        for fut in as_completed(futs):
+            name = futs[fut]
+            try:
+                results[name] = fut.result()
+            except Exception as e:
+                errors[name] = e
+    return results, errors
+
 def extract_album_img_from_page_json(html: str) -> Optional[str]:
-    # Try common JSON keys embedded on the page
-    for key in ("album_img", "union_cover"):
-        m = re.search(rf'"{key}"\s*:\s*"([^"]+)"', html, re.I)
+    # Try common JSON keys embedded on the page; the capture is a raw JSON
+    # string literal (e.g. "http:\/\/imge..."), so decode it first
+    for pat in _RE_PAGE_IMG:
+        m = pat.search(html)
         if m:
-            return _normalize_img(m.group(1))
+            try:
+                u = json.loads('"%s"' % m.group(1))
+            except ValueError:
+                continue
+            if isinstance(u, str) and u.startswith("http"):
+                return _normalize_img(u)
     return None
 
-def fetch_og_image(page_url: str, headers: dict) -> Optional[str]:
+def og_image_from_html(html: str) -> Optional[str]:
+    m = _RE_OG.search(html)
+    if not m:
+        return None
+    # Attribute value: undo HTML entities such as &amp; in the query string
+    u = html_lib.unescape(m.group(1))
+    return _normalize_img(u) if u.startswith("http") else None
+
+def fetch_og_image(page_url: str, session: requests.Session) -> Optional[str]:
+    # og:image sits in <head>, so ask for the first 32KB only; servers that
+    # ignore Range just answer 200 with the whole page
     try:
-        r = requests.get(page_url, headers=headers, timeout=12)
+        r = session.get(page_url, headers={"Range": OG_RANGE}, timeout=12)
         r.raise_for_status()
-        html = r.text
-        m = re.search(r'<meta\s+property=["\']og:image["\']\s+content=["\']([^"\']+)["\']', html, re.I)
-        if m:
-            u = m.group(1).replace("{size}", "1000")
-            if u.startswith("http://"):
-                u = "https://" + u[7:]
+        u = og_image_from_html(r.text)
+        if u or r.status_code != 206:
             return u
+        # Tag lies beyond the range: retry once for the full page
+        r = session.get(page_url, timeout=12)
+        r.raise_for_status()
+        return og_image_from_html(r.text)
     except Exception:
         pass
     return None
 
-def fetch_mobile_mixsong_og_image(url: str) -> Optional[str]:
+def mobile_share_url(url: str) -> Optional[str]:
     """
     If the desktop mixsong page is crippled on mobile/Termux,
-    try the mobile-share variant which often exposes the same og:image.
+    the mobile-share variant often exposes the same og:image.
     We convert .../mixsong/<mid>.html to .../share/mixsong/<mid>.html
     """
-    m = re.search(r"/(?:mixsong|kgmixsong)/([A-Za-z0-9]+)\.html", url)
+    m = _RE_MIXSONG.search(url)
     if not m:
         return None
-    mid = m.group(1)
-    mobile_share = f"https://m.kugou.com/share/mixsong/{mid}.html"
-    return fetch_og_image(mobile_share, HEADERS_MOBILE)
-
-def choose_best_cover(src_page_url: str,
-                      page_html: Optional[str],
-                      album_id: Optional[str],
-                      mobile: Dict,
-                      desktop: Optional[Dict]) -> Tuple[str, str]:
+    return f"https://m.kugou.com/share/mixsong/{m.group(1)}.html"
+
+def probe_og_images(candidates: List[Tuple[str, str, requests.Session]]) -> List[Tuple[Optional[str], str]]:
+    """
+    Fetch og:image for every (source, page_url, session) candidate at once.
+    Returns [(img, source)] in candidate order, so callers keep their priority.
+    """
+    if not candidates:
+        return []
+    with ThreadPoolExecutor(max_workers=len(candidates)) as ex:
+        imgs = list(ex.map(lambda c: fetch_og_image(c[1], c[2]), candidates))
+    return [(img, src) for img, (src, _, _) in zip(imgs, candidates)]
+
+def cover_candidates(src_page_url: str,
+                     page_html: Optional[str],
+                     album_id: Optional[str],
+                     mobile: Dict,
+                     desktop: Optional[Dict],
+                     page_og: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (cover_url, source) in priority order. Pages are only probed once
+    the earlier candidates are used up, so a caller that stops at the first
+    cover it manages to download skips the remaining requests.
+    """
+    seen = set()
+
+    def usable(u: Optional[str]) -> bool:
+        # album server, not singer avatar
+        if u and "imge.kugou.com" in u and u not in seen:
+            seen.add(u)
+            return True
+        return False
+
     # 0) If desktop JSON worked, prefer its album image keys
     if desktop:
         for key in ("album_img", "union_cover", "img", "imgUrl"):
             u = desktop.get(key)
             if isinstance(u, str) and u:
-                u = u.replace("{size}", "1000")
-                if u.startswith("http://"):
-                    u = "https://" + u[7:]
-                if "imge.kugou.com" in u:  # album server, not singer avatar
-                    return u, f"desktop:{key}"
-
-    # 1) Try og:image on the original (desktop) mixsong page
-    u = fetch_og_image(src_page_url, HEADERS_DESKTOP)
-    if u and "imge.kugou.com" in u:
-        return u, "page:og:image"
+                u = _normalize_img(u)
+                if usable(u):
+                    yield u, f"desktop:{key}"
+
+    # 1) album_img / og:image on the original (desktop) mixsong page: read
+    # from the html already scraped while resolving the hash, otherwise the
+    # og:image resolved by fetch_all
+    if page_html:
+        u = extract_album_img_from_page_json(page_html)
+        if usable(u):
+            yield u, "cached_html:album_img"
+        u = og_image_from_html(page_html)
+        if usable(u):
+            yield u, "cached_html:og:image"
+    elif usable(page_og):
+        yield page_og, "page:og:image"
 
     # 2) If that fails on mobile, try the *mobile share* mixsong page
-    u = fetch_mobile_mixsong_og_image(src_page_url)
-    if u and "imge.kugou.com" in u:
-        return u, "mobile_share:og:image"
-
     # 3) As another fallback, try the album page og:image when album_id is known
+    # They are probed concurrently and yielded in this order.
+    candidates = []
+    share = mobile_share_url(src_page_url)
+    if share:
+        candidates.append(("mobile_share:og:image", share, S_MOBILE))
     if album_id:
         for album_url in (
             f"https://www.kugou.com/album/{album_id}.html",
             f"https://m.kugou.com/share/album/{album_id}.html",
         ):
-            u2 = fetch_og_image(album_url, HEADERS_DESKTOP)
-            if u2 and "imge.kugou.com" in u2:
-                return u2, "album_page:og:image"
+            candidates.append(("album_page:og:image", album_url, S_DESKTOP))
+    for u, src in probe_og_images(candidates):
+        if usable(u):
+            yield u, src
 
     # 4) Absolute fallback: mobile avatar (usually singer head)
-    u = mobile.get("imgUrl") or ""
-    u = u.replace("{size}", "1000")
-    if u.startswith("http://"):
-        u = "https://" + u[7:]
-    return u, "mobile:imgUrl"
-
-
-def fetch_album_page_cover(album_id: str) -> Optional[str]:
-    # Try the desktop album page
-    for album_url in (
-        f"https://www.kugou.com/album/{album_id}.html",
-        f"https://m.kugou.com/share/album/{album_id}.html",
-    ):
-        u = fetch_og_image(album_url, HEADERS_DESKTOP)
-        if u:
-            return u
-    return None
-
+    u = _normalize_img(mobile.get("imgUrl") or "")
+    if u and u not in seen:
+        yield u, "mobile:imgUrl"
 
 # ---------- Tagging ----------
-def add_basic_id3_tags(filename: str, mobile_data: Dict):
-    file_name = mobile_data.get("fileName", "Unknown")
+# Spare room kept in the ID3 tag so later tag edits fit in place
+ID3_PADDING = 8192
+
+def tag_fields(mobile: Dict, desktop: Optional[Dict]) -> Tuple[str, str, Optional[str]]:
+    file_name = mobile.get("fileName", "Unknown")
     # Title tag: only the right side after "Artist - Title" if present
     title = file_name.split(" - ", 1)[-1] if " - " in file_name else file_name
-    artist = mobile_data.get("singerName", "Unknown")
+    artist = mobile.get("singerName", "Unknown")
+    album = (desktop or {}).get("album_name") or mobile.get("album_name")
+    return title, artist, album
 
-    audio = mutagen.easyid3.EasyID3(filename)
-    audio["title"] = title
-    audio["artist"] = artist
-    audio.save()
+def _synchsafe(n: int) -> bytes:
+    return bytes(((n >> 21) & 0x7F, (n >> 14) & 0x7F, (n >> 7) & 0x7F, n & 0x7F))
+
+def _id3v23_frame(frame_id: str, body: bytes) -> bytes:
+    # v2.3 frame: id, plain 32-bit big-endian size, two flag bytes
+    return frame_id.encode("ascii") + struct.pack(">I", len(body)) + b"\x00\x00" + body
+
+def _id3v23_text(text: str) -> bytes:
+    # Encoding 0x01: UTF-16 with BOM
+    return b"\x01" + text.encode("utf-16")
+
+def build_id3v23(title: str, artist: str, album: Optional[str],
+                 cover_bytes: Optional[bytes], cover_mime: str = "image/jpeg") -> bytes:
+    """
+    Emit a complete ID3v2.3 tag (TIT2/TPE1/TALB/APIC) for a file that has
+    none yet, with some padding so later edits can be done in place.
+    """
+    frames = _id3v23_frame("TIT2", _id3v23_text(title))
+    frames += _id3v23_frame("TPE1", _id3v23_text(artist))
+    if album:
+        frames += _id3v23_frame("TALB", _id3v23_text(album))
+    if cover_bytes:
+        # latin-1 encoding, mime, picture type 3 (front cover), description
+        apic = b"\x00" + cover_mime.encode("latin-1") + b"\x00" + b"\x03" + b"Front cover\x00"
+        frames += _id3v23_frame("APIC", apic + cover_bytes)
+    frames += b"\x00" * ID3_PADDING
+    return b"ID3\x03\x00\x00" + _synchsafe(len(frames)) + frames
+
+def prepend_id3(path: str, header: bytes):
+    tmp = path + ".id3"
+    try:
+        with open(path, "rb") as src, open(tmp, "wb") as dst:
+            dst.write(header)
+            shutil.copyfileobj(src, dst, length=CHUNK_SIZE)
+    except BaseException:
+        # e.g. disk full: don't leave a half-written copy next to the .part
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, path)
+
+def write_all_tags(path: str, mobile: Dict, desktop: Optional[Dict],
+                   cover_bytes: Optional[bytes], mime: str = "image/jpeg"):
+    """
+    Write title/artist/album and the cover in one pass. A fresh download
+    without ID3 just gets a hand-built header prepended; files that already
+    carry a tag are edited with mutagen in a single open/modify/save cycle.
+    """
+    title, artist, album = tag_fields(mobile, desktop)
 
-def embed_cover(filename: str, cover_url: str, headers: dict):
-    if not cover_url:
-        print("No cover URL available to embed.")
+    with open(path, "rb") as f:
+        has_id3 = f.read(3) == b"ID3"
+    if not has_id3:
+        prepend_id3(path, build_id3v23(title, artist, album, cover_bytes, mime))
         return
-    tmp = filename + ".cover"
-    download_file(tmp, cover_url, headers)
-    audio = mutagen.mp3.MP3(filename)
+
+    # mutagen is only needed on this path; don't pay its import at startup
+    from mutagen.id3 import APIC, TALB, TIT2, TPE1, Encoding, PictureType
+    from mutagen.mp3 import MP3
+    audio = MP3(path)
     try:
         audio.add_tags()
     except Exception:
         pass
-    mime = "image/jpeg"
-    lower = cover_url.lower()
-    if lower.endswith(".png"):
-        mime = "image/png"
-    elif lower.endswith(".webp"):
-        mime = "image/webp"
-    with open(tmp, "rb") as f:
-        audio.tags.add(
-            mutagen.id3.APIC(
-                encoding=mutagen.id3.Encoding.UTF8,
+    audio.tags.setall("TIT2", [TIT2(encoding=Encoding.UTF8, text=title)])
+    audio.tags.setall("TPE1", [TPE1(encoding=Encoding.UTF8, text=artist)])
+    if album:
+        audio.tags.setall("TALB", [TALB(encoding=Encoding.UTF8, text=album)])
+    if cover_bytes:
+        audio.tags.setall("APIC", [
+            APIC(
+                encoding=Encoding.UTF8,
                 mime=mime,
-                type=mutagen.id3.PictureType.COVER_FRONT,
+                type=PictureType.COVER_FRONT,
                 desc="Front cover",
-                data=f.read(),
+                data=cover_bytes,
             )
-        )
-    os.remove(tmp)
-    audio.save()
-    print("✅ Embedded cover art.")
+        ])
+    # Keep at least ID3_PADDING spare bytes so a growing tag doesn't shift
+    # the audio frames behind it on every save
+    audio.save(padding=lambda info: max(info.padding, ID3_PADDING))
 
 # ---------- Main ----------
+def fetch_cover(url: str, cover: Optional[str], page_html: Optional[str],
+                album_id: Optional[str], mobile: Dict, desktop: Optional[Dict],
+                page_og: Optional[str]) -> Tuple[Optional[bytes], str]:
+    # Choose cover: take the first candidate that actually downloads
+    if cover:
+        candidates = iter([(_normalize_img(cover), "override")])
+    else:
+        candidates = cover_candidates(url, page_html, album_id, mobile, desktop,
+                                      page_og)
+    cover_bytes, mime = None, "image/jpeg"
+    for cover_url, cover_src in candidates:
+        print(f"🖼  Cover source: {cover_src} -> {cover_url}")
+        try:
+            cover_bytes = fetch_bytes(cover_url, S_DESKTOP)
+            mime = sniff_mime(cover_bytes)
+            break
+        except Exception as e:
+            print(f"⚠️  Cover download failed: {e}")
+    if not cover_bytes:
+        print("No cover available to embed.")
+    return cover_bytes, mime
+
+KUGOU_HOSTS = ("m.kugou.com", "www.kugou.com", "wwwapi.kugou.com")
+
+def _resolve_quietly(host: str):
+    # Offline / bad DNS: the real request reports the error later
+    try:
+        socket.gethostbyname(host)
+    except OSError:
+        pass
+
+def prewarm_dns():
+    # Resolve the API hosts in the background while the URL is parsed; the
+    # results are not used, the OS resolver cache is what gets warmed.
+    # Daemon threads, so a slow resolver never holds up interpreter exit.
+    for host in KUGOU_HOSTS:
+        threading.Thread(target=_resolve_quietly, args=(host,), daemon=True).start()
+
 def main():
     ap = argparse.ArgumentParser(description="KuGou downloader (free only).")
     ap.add_argument("url", help="KuGou song URL (mixsong or hash form)")
     ap.add_argument("--cover", help="Override cover image URL", default=None)
     args = ap.parse_args()
+    prewarm_dns()
 
-    url = args.url.strip()
+    try:
+        run(args.url.strip(), args.cover)
+    finally:
+        S_DESKTOP.close()
+        S_MOBILE.close()
+
+def run(url: str, cover: Optional[str]):
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
     print(f"🎵 URL: {url}")
 
     # Resolve hash (+ optional album_id) and capture page html if scraped
@@ -279,55 +639,63 @@ def main():
         print("❌ Error:", e)
         sys.exit(2)
 
-    # Mobile API (provides free play URL)
-    try:
-        mobile = get_mobile_meta(h)
-    except Exception as e:
-        print("❌ Error:", e)
+    # Mobile API (provides free play URL), desktop meta (non-fatal; richer
+    # cover if it works) and the page og:image, all fetched concurrently
+    # (the og:image fetch is skipped when the page html is already in hand)
+    results, errors = fetch_all(h, album_id, None if cover or page_html else url)
+    if "mobile" in errors:
+        print("❌ Error:", errors["mobile"])
         sys.exit(3)
-
-    # Desktop meta (non-fatal; richer cover if it works)
-    desktop = None
-    try:
-        desktop = get_desktop_meta(h, album_id)
-    except Exception as e:
-        print(f"⚠️  Desktop meta not available: {e}")
-
-    # Choose cover
-    if args.cover:
-        cover_url, cover_src = _normalize_img(args.cover), "override"
-    else:
-        cover_url, cover_src = choose_best_cover(url, page_html, album_id, mobile, desktop)
-    print(f"🖼  Cover source: {cover_src} -> {cover_url or 'None'}")
+    mobile, desktop = results["mobile"], results["desktop"]
+    if "desktop" in errors:
+        print(f"⚠️  Desktop meta not available: {errors['desktop']}")
 
     # Filename as "Artist - Title.mp3" (from mobile fileName), trimmed
     base_name = windows_safe_name(mobile.get("fileName", "Unknown")).strip() + ".mp3"
     out_path = os.path.join(OUTPUT_DIR, base_name)
 
-    # Download audio
     play_url = mobile.get("url")
     if not play_url:
         print("❌ No playable URL in mobile API (track may be VIP only).")
         sys.exit(4)
 
+    # Download audio in the background; cover selection and its download
+    # don't depend on the audio body, so they run meanwhile
+    cancel = threading.Event()
+    audio_pool = ThreadPoolExecutor(max_workers=1)
+    audio_fut = audio_pool.submit(download_file, out_path, play_url, S_MOBILE, cancel)
     try:
-        download_file(out_path, play_url, HEADERS_MOBILE)
-    except Exception as e:
-        print("❌ Download error:", e)
-        sys.exit(5)
+        cover_bytes, mime = fetch_cover(url, cover, page_html, album_id, mobile, desktop,
+                                        results["og"])
 
-    # Tagging
-    if out_path.lower().endswith(".mp3"):
-        ensure_id3_container(out_path)
         try:
-            add_basic_id3_tags(out_path, mobile)
+            part_path = audio_fut.result()
         except Exception as e:
-            print(f"⚠️  Tagging (basic) failed: {e}")
+            print("❌ Download error:", e)
+            if os.path.exists(out_path + ".part"):
+                os.remove(out_path + ".part")
+            sys.exit(5)
+    except BaseException:
+        # Ctrl-C (or exit) mid-download: tell the worker to stop instead of
+        # waiting for the whole body, then drop what it had written so an
+        # interrupted run leaves nothing behind
+        cancel.set()
+        audio_pool.shutdown(wait=True, cancel_futures=True)
+        if os.path.exists(out_path + ".part"):
+            os.remove(out_path + ".part")
+        raise
+    finally:
+        audio_pool.shutdown()
+
+    # Tagging (on the .part file; it only takes the final name afterwards)
+    if out_path.lower().endswith(".mp3"):
         try:
-            if cover_url:
-                embed_cover(out_path, cover_url, HEADERS_DESKTOP)
+            write_all_tags(part_path, mobile, desktop, cover_bytes, mime)
+            if cover_bytes:
+                print("✅ Embedded cover art.")
         except Exception as e:
-            print(f"⚠️  Tagging (cover) failed: {e}")
+            print(f"⚠️  Tagging failed: {e}")
+    os.replace(part_path, out_path)
 
     print(f"✅ Done. Saved to: {out_path}")
 